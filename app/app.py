@@ -2,6 +2,7 @@
 # UNSRAT WEATHER ASSISTANT - STREAMLIT APP
 # ==========================================
 import streamlit as st
+import altair as alt
 import pandas as pd
 import numpy as np
 import joblib
@@ -11,7 +12,9 @@ from datetime import datetime
 # --- IMPORT MODULES DARI FOLDER UTILS ---
 try:
     from utils.google_sheets import read_sheet, append_row
-    from utils.preprocessing import prepare_input, FEATURES_SUHU, FEATURES_HUJAN
+    from utils.preprocessing import (
+        prepare_input, build_whatif_grid, FEATURES_SUHU, FEATURES_HUJAN, WHATIF_VARIABLES
+    )
 except ImportError as e:
     st.error(f"Gagal mengimport modul dari folder 'utils'. Pastikan file ada. Error: {e}")
     st.stop()
@@ -158,6 +161,17 @@ def calculate_heat_index(T, RH):
             
     return feels_like
 
+def get_comfort_status(real_feel):
+    """Mengelompokkan suhu terasa (Heat Index) menjadi kelas kenyamanan termal."""
+    if real_feel < 25: 
+        return "Sejuk"
+    elif 25 <= real_feel <= 29:
+        return "Normal"
+    elif 29 < real_feel <= 33:
+        return "Hangat"
+    else: # > 33
+        return "Panas Menyengat"
+
 def get_recommendation_classification(pred_temp, pred_rain_class, pred_humidity=None):
     """
     Menerjemahkan kelas hujan dan suhu menjadi saran aksi.
@@ -182,17 +196,7 @@ def get_recommendation_classification(pred_temp, pred_rain_class, pred_humidity=
     # Default kelembapan 80% jika tidak dipassing (rata-rata Manado)
     rh_val = pred_humidity if pred_humidity is not None else 80 
     
-    real_feel = calculate_heat_index(pred_temp, rh_val)
-    
-    status_suhu = "Nyaman"
-    if real_feel < 25: 
-        status_suhu = "Sejuk"
-    elif 25 <= real_feel <= 29:
-        status_suhu = "Normal"
-    elif 29 < real_feel <= 33:
-        status_suhu = "Hangat"
-    else: # > 33
-        status_suhu = "Panas Menyengat"
+    status_suhu = get_comfort_status(calculate_heat_index(pred_temp, rh_val))
         
     # --- 3. REKOMENDASI AKSI ---
     saran = "✅ Cuaca kondusif untuk aktivitas kampus."
@@ -214,6 +218,68 @@ def get_recommendation_classification(pred_temp, pred_rain_class, pred_humidity=
         warna = "warning"
             
     return status_hujan, status_suhu, icon, saran, warna, pred_mm_display
+
+# ==========================================
+# FUNGSI DATA INPUT & SIMULASI WHAT-IF
+# ==========================================
+LABEL_HUJAN = {0: "Cerah / Berawan", 1: "Hujan Ringan - Sedang", 2: "Hujan Lebat"}
+LABEL_VARIABEL = {"Suhu": "Suhu (°C)", "Kelembapan": "Kelembapan (%)", "CurahHujan": "Curah Hujan (mm)"}
+
+def build_base_input(current_row):
+    """Menggabungkan data historis Google Sheets dengan kondisi saat ini lalu menjalankan preprocessing."""
+    df_history = read_sheet(CREDENTIALS_PATH, SPREADSHEET_ID, SHEET_NAME)
+    df_current = pd.DataFrame([current_row])
+    
+    if not df_history.empty:
+        df_combined = pd.concat([df_history, df_current], ignore_index=True)
+    else:
+        df_combined = df_current
+    
+    return prepare_input(df_combined)
+
+def predict_whatif(models, X_grid, horizons=(1, 3, 6)):
+    """
+    Memprediksi seluruh grid what-if sekaligus.
+    Hanya satu panggilan predict per model per horizon, bukan satu per kombinasi input.
+    """
+    X_suhu = X_grid[FEATURES_SUHU]
+    X_hujan = X_grid[FEATURES_HUJAN]
+    
+    hasil = {}
+    for h in horizons:
+        pred_t = np.asarray(models[f"suhu_{h}h"].predict(X_suhu), dtype=float)
+        pred_r = np.asarray(models[f"hujan_{h}h"].predict(X_hujan)).astype(int)
+        
+        # Kelas kenyamanan memakai kelembapan masing-masing baris grid
+        comfort = [
+            get_comfort_status(calculate_heat_index(t, rh))
+            for t, rh in zip(pred_t, X_grid["Kelembapan"].to_numpy())
+        ]
+        
+        hasil[h] = pd.DataFrame({
+            "Prediksi Suhu (°C)": pred_t,
+            "Kenyamanan": comfort,
+            "Kelas Hujan": [LABEL_HUJAN.get(r, LABEL_HUJAN[2]) for r in pred_r],
+        })
+    return hasil
+
+def render_whatif_heatmap(df_plot, x_col, y_col, value_col, value_type, scale=None):
+    """Menampilkan heatmap sensitivitas satu keluaran model terhadap dua variabel input."""
+    color_kwargs = {"title": value_col}
+    if scale is not None:
+        color_kwargs["scale"] = scale
+    
+    chart = alt.Chart(df_plot).mark_rect().encode(
+        x=alt.X(f"{x_col}:O", title=LABEL_VARIABEL[x_col], axis=alt.Axis(format=".1f", labelOverlap=True)),
+        y=alt.Y(f"{y_col}:O", title=LABEL_VARIABEL[y_col], sort="descending", axis=alt.Axis(format=".1f", labelOverlap=True)),
+        color=alt.Color(f"{value_col}:{value_type}", **color_kwargs),
+        tooltip=[
+            alt.Tooltip(f"{x_col}:Q", format=".1f"),
+            alt.Tooltip(f"{y_col}:Q", format=".1f"),
+            alt.Tooltip(f"{value_col}:{value_type}"),
+        ],
+    )
+    st.altair_chart(chart, use_container_width=True)
 # ==========================================
 # INTERFACE UTAMA (UI)
 # ==========================================
@@ -264,14 +330,31 @@ if models_dict:
             }
             target_h = map_jam[pilihan_waktu]
             
+            st.divider()
+            
+            # --- MODE SIMULASI WHAT-IF ---
+            st.subheader("🧪 Mode Analisis")
+            mode_analisis = st.radio(
+                "Pilih mode:",
+                ("Prediksi Tunggal", "Simulasi What-If")
+            )
+            
+            with st.expander("Pengaturan Simulasi What-If"):
+                var_x = st.selectbox("Variabel sumbu X", WHATIF_VARIABLES, index=0,
+                                     format_func=LABEL_VARIABEL.get)
+                var_y = st.selectbox("Variabel sumbu Y", WHATIF_VARIABLES, index=1,
+                                     format_func=LABEL_VARIABEL.get)
+                rentang_suhu = st.slider("Rentang Suhu (°C)", 20.0, 40.0, (24.0, 34.0), 0.5)
+                rentang_kelembapan = st.slider("Rentang Kelembapan (%)", 30, 100, (50, 100))
+                rentang_curah = st.slider("Rentang Curah Hujan (mm)", 0.0, 100.0, (0.0, 20.0), 0.5)
+                ukuran_grid = st.slider("Ukuran grid (titik per sumbu)", 5, 50, 25)
+            
             st.divider()
             submit_btn = st.form_submit_button("🔍 Analisis Cuaca", type="primary")
 
     if submit_btn:
         with st.spinner("Mengambil data historis & memproses prediksi..."):
             try:
-                df_history = read_sheet(CREDENTIALS_PATH, SPREADSHEET_ID, SHEET_NAME)
-                
                 # Gunakan nama kolom yang sudah distandarisasi sistem (Suhu, Kelembapan, dst)
                 current_row = {
                     'time': waktu_skrg.replace(hour=jam_now, minute=0, second=0).isoformat(),
@@ -281,61 +364,102 @@ if models_dict:
                     'DeskripsiCuaca': 0 # Dummy
                 }
                 
-                df_current = pd.DataFrame([current_row])
-                
-                if not df_history.empty:
-                    df_combined = pd.concat([df_history, df_current], ignore_index=True)
-                else:
-                    df_combined = df_current
-                
-                # Preprocessing
-                X_processed = prepare_input(df_combined)
+                # Preprocessing (histori dibaca & diproses sekali)
+                X_processed = build_base_input(current_row)
                 
                 if X_processed.empty:
                     st.error("Gagal membuat fitur prediksi. Data historis tidak cukup/valid.")
                     st.stop()
                 
-                # Filter fitur sesuai model
-                X_final_suhu = X_processed[FEATURES_SUHU]
-                X_final_hujan = X_processed[FEATURES_HUJAN]
+                if mode_analisis == "Simulasi What-If":
+                    if var_x == var_y:
+                        st.error("Variabel sumbu X dan Y harus berbeda.")
+                        st.stop()
+                    
+                    rentang = {
+                        "Suhu": rentang_suhu,
+                        "Kelembapan": rentang_kelembapan,
+                        "CurahHujan": rentang_curah,
+                    }
+                    x_values = np.linspace(*rentang[var_x], ukuran_grid)
+                    y_values = np.linspace(*rentang[var_y], ukuran_grid)
+                    
+                    # Satu matriks fitur untuk seluruh kombinasi input
+                    X_grid = build_whatif_grid(X_processed, var_x, x_values, var_y, y_values)
+                    hasil_whatif = predict_whatif(models_dict, X_grid)
+                    
+                    # ==========================================
+                    # TAMPILAN HASIL (HEATMAP SENSITIVITAS)
+                    # ==========================================
+                    st.divider()
+                    st.subheader("🧪 Simulasi What-If: Sensitivitas Prediksi")
+                    st.caption(
+                        f"{ukuran_grid}×{ukuran_grid} kombinasi {LABEL_VARIABEL[var_x]} dan {LABEL_VARIABEL[var_y]}. "
+                        "Variabel lain mengikuti input sensor di panel kiri."
+                    )
+                    
+                    skala_kenyamanan = alt.Scale(
+                        domain=["Sejuk", "Normal", "Hangat", "Panas Menyengat"],
+                        range=["#4b9cd3", "#7bc96f", "#f5b942", "#e4572e"]
+                    )
+                    skala_hujan = alt.Scale(
+                        domain=list(LABEL_HUJAN.values()),
+                        range=["#f2e394", "#5dade2", "#1b2631"]
+                    )
+                    
+                    tabs = st.tabs([f"{h} Jam ke Depan" for h in hasil_whatif])
+                    for tab, (h, df_pred) in zip(tabs, hasil_whatif.items()):
+                        df_plot = pd.concat([X_grid[[var_x, var_y]], df_pred], axis=1)
+                        with tab:
+                            st.markdown("#### 🌡️ Prediksi Suhu")
+                            render_whatif_heatmap(df_plot, var_x, var_y, "Prediksi Suhu (°C)", "Q",
+                                                  alt.Scale(scheme="redyellowblue", reverse=True))
+                            st.markdown("#### 😌 Kenyamanan Termal (Heat Index)")
+                            render_whatif_heatmap(df_plot, var_x, var_y, "Kenyamanan", "N", skala_kenyamanan)
+                            st.markdown("#### 💧 Kelas Hujan")
+                            render_whatif_heatmap(df_plot, var_x, var_y, "Kelas Hujan", "N", skala_hujan)
+                else:
+                    # Filter fitur sesuai model
+                    X_final_suhu = X_processed[FEATURES_SUHU]
+                    X_final_hujan = X_processed[FEATURES_HUJAN]
                 
-                # ==========================================
-                # TAMPILAN HASIL (SINGLE VIEW)
-                # ==========================================
-                st.divider()
-                st.subheader(f"🔮 Hasil Peramalan: {pilihan_waktu}")
+                    # ==========================================
+                    # TAMPILAN HASIL (SINGLE VIEW)
+                    # ==========================================
+                    st.divider()
+                    st.subheader(f"🔮 Hasil Peramalan: {pilihan_waktu}")
                 
-                # Prediksi HANYA untuk jam yang dipilih (target_h)
-                model_suhu_key = f"suhu_{target_h}h"
-                model_hujan_key = f"hujan_{target_h}h"
+                    # Prediksi HANYA untuk jam yang dipilih (target_h)
+                    model_suhu_key = f"suhu_{target_h}h"
+                    model_hujan_key = f"hujan_{target_h}h"
                 
-                pred_t = models_dict[model_suhu_key].predict(X_final_suhu)[0]
-                pred_r_class = models_dict[model_hujan_key].predict(X_final_hujan)[0]
+                    pred_t = models_dict[model_suhu_key].predict(X_final_suhu)[0]
+                    pred_r_class = models_dict[model_hujan_key].predict(X_final_hujan)[0]
                 
-                h_txt, t_txt, icon, saran, color, pred_mm_display = get_recommendation_classification(pred_t, pred_r_class)
+                    h_txt, t_txt, icon, saran, color, pred_mm_display = get_recommendation_classification(pred_t, pred_r_class)
                 
-                # Tampilan Card Besar
-                col_res1, col_res2 = st.columns([1, 2])
+                    # Tampilan Card Besar
+                    col_res1, col_res2 = st.columns([1, 2])
                 
-                with col_res1:
-                    st.markdown(f"<h1 style='text-align: center; font-size: 80px;'>{icon}</h1>", unsafe_allow_html=True)
-                    st.markdown(f"<h3 style='text-align: center;'>{h_txt}</h3>", unsafe_allow_html=True)
+                    with col_res1:
+                        st.markdown(f"<h1 style='text-align: center; font-size: 80px;'>{icon}</h1>", unsafe_allow_html=True)
+                        st.markdown(f"<h3 style='text-align: center;'>{h_txt}</h3>", unsafe_allow_html=True)
                 
-                with col_res2:
-                    st.markdown("### Detail Angka")
-                    c1, c2 = st.columns(2)
-                    c1.metric("🌡️ Prediksi Suhu", f"{pred_t:.1f}°C", delta=t_txt, delta_color="off")
-                    c2.metric("💧 Intensitas Hujan", pred_mm_display)
+                    with col_res2:
+                        st.markdown("### Detail Angka")
+                        c1, c2 = st.columns(2)
+                        c1.metric("🌡️ Prediksi Suhu", f"{pred_t:.1f}°C", delta=t_txt, delta_color="off")
+                        c2.metric("💧 Intensitas Hujan", pred_mm_display)
                     
-                    st.markdown("### 💡 Rekomendasi")
-                    if color == "error":
-                        st.error(saran)
-                    elif color == "warning":
-                        st.warning(saran)
-                    elif color == "info":
-                        st.info(saran)
-                    else:
-                        st.success(saran)
+                        st.markdown("### 💡 Rekomendasi")
+                        if color == "error":
+                            st.error(saran)
+                        elif color == "warning":
+                            st.warning(saran)
+                        elif color == "info":
+                            st.info(saran)
+                        else:
+                            st.success(saran)
                 
             except Exception as e:
                 st.error("Terjadi kesalahan sistem saat prediksi:")
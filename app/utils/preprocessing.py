@@ -25,6 +25,9 @@ FEATURES_HUJAN = [
     'hari_dalam_minggu'
 ]
 
+# Variabel sensor yang boleh divariasikan pada mode simulasi what-if
+WHATIF_VARIABLES = ['Suhu', 'Kelembapan', 'CurahHujan']
+
 # ==============================================================================
 # FUNGSI UTILITAS
 # ==============================================================================
@@ -152,4 +155,23 @@ def prepare_input(df):
     if 'Suhu' not in last_row.columns and 'Suhu' in df_final.columns:
          last_row['Suhu'] = df_final['Suhu'].iloc[-1]
 
-    return last_row
\ No newline at end of file
+    return last_row
+
+def build_whatif_grid(base_row, x_col, x_values, y_col, y_values):
+    """
+    Membuat matriks fitur what-if dari satu baris hasil prepare_input.
+    Setiap kombinasi nilai x_col dan y_col menjadi satu baris, sedangkan fitur
+    lain (kalender & lag) disalin dari base_row sehingga histori cukup
+    diproses sekali dan seluruh grid bisa diprediksi dalam satu panggilan.
+    """
+    if x_col not in WHATIF_VARIABLES or y_col not in WHATIF_VARIABLES:
+        raise ValueError(f"Variabel what-if harus salah satu dari {WHATIF_VARIABLES}")
+    if x_col == y_col:
+        raise ValueError("Variabel sumbu X dan Y harus berbeda.")
+
+    xx, yy = np.meshgrid(np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float))
+
+    grid = base_row.iloc[np.zeros(xx.size, dtype=int)].reset_index(drop=True)
+    grid[x_col] = xx.ravel()
+    grid[y_col] = yy.ravel()
+    return grid